@@ -1,7 +1,53 @@
 import json
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from scienceqa_vpgm_loader import load_prompt_template, get_template_by_id
 
+# Full prompt layout; only the four JSON blocks are filled in per call.
+_PROMPT_TEMPLATE = "\n".join([
+    "You are performing verbalized probabilistic graphical model inference.",
+    "",
+    "### Task",
+    "",
+    "Given the following ScienceQA question, fill in the missing latent_posteriors and answer_posterior according to the template.",
+    "",
+    "### Observed Data",
+    "",
+    "{observed}",
+    "",
+    "### Metadata",
+    "",
+    "{meta}",
+    "",
+    "### Latent Variable Instructions",
+    "",
+    "For each latent variable, follow these instructions:",
+    "{cpds}",
+    "",
+    "### Output Format (MUST match exactly)",
+    "",
+    "You must output ONLY a JSON object with the following structure:",
+    "{fields}",
+    "",
+    "### Your Output",
+    "",
+    "Fill in:",
+    "",
+    "* latent_posteriors",
+    "* answer_posterior",
+    "",
+    "Produce only valid JSON."
+])
+
+# Serialized (verbal_cpd_templates, instance_fields) per template, keyed by id(template).
+# The template itself is kept alongside so its id cannot be reused by another object.
+_TEMPLATE_STR_CACHE: Dict[int, Tuple[Dict[str, Any], str, str]] = {}
+
 def pretty(obj: Any) -> str:
     """
     Returns a pretty-printed JSON string for the given object.
@@ -12,8 +58,31 @@ def pretty(obj: Any) -> str:
     Returns:
         A formatted JSON string.
     """
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode("utf-8")
     return json.dumps(obj, indent=2, ensure_ascii=False)
 
+def _get_template_strings(template: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Returns the serialized template fragments, computing them on first use.
+
+    Args:
+        template: The dictionary containing the vPGM template.
+
+    Returns:
+        A tuple of (verbal_cpd_templates JSON, instance_fields JSON).
+    """
+    key = id(template)
+    cached = _TEMPLATE_STR_CACHE.get(key)
+    if cached is None or cached[0] is not template:
+        cached = (
+            template,
+            pretty(template.get("verbal_cpd_templates", {})),
+            pretty(template.get("instance_fields", {}))
+        )
+        _TEMPLATE_STR_CACHE[key] = cached
+    return cached[1], cached[2]
+
 def build_vpgm_prompt(
     skeleton: Dict[str, Any],
     template: Dict[str, Any],
@@ -32,45 +101,14 @@ def build_vpgm_prompt(
     """
     observed_str = pretty(skeleton.get("observed", {}))
     meta_str = pretty(skeleton.get("question_meta", {}))
-    cpd_templates_str = pretty(template.get("verbal_cpd_templates", {}))
-    instance_fields_str = pretty(template.get("instance_fields", {}))
-
-    prompt_parts = [
-        "You are performing verbalized probabilistic graphical model inference.",
-        "",
-        "### Task",
-        "",
-        "Given the following ScienceQA question, fill in the missing latent_posteriors and answer_posterior according to the template.",
-        "",
-        "### Observed Data",
-        "",
-        observed_str,
-        "",
-        "### Metadata",
-        "",
-        meta_str,
-        "",
-        "### Latent Variable Instructions",
-        "",
-        "For each latent variable, follow these instructions:",
-        cpd_templates_str,
-        "",
-        "### Output Format (MUST match exactly)",
-        "",
-        "You must output ONLY a JSON object with the following structure:",
-        instance_fields_str,
-        "",
-        "### Your Output",
-        "",
-        "Fill in:",
-        "",
-        "* latent_posteriors",
-        "* answer_posterior",
-        "",
-        "Produce only valid JSON."
-    ]
+    cpd_templates_str, instance_fields_str = _get_template_strings(template)
 
-    return "\n".join(prompt_parts)
+    return _PROMPT_TEMPLATE.format(
+        observed=observed_str,
+        meta=meta_str,
+        cpds=cpd_templates_str,
+        fields=instance_fields_str
+    )
 
 def build_prompt_for_instance(skeleton: Dict[str, Any], template_id: str = "scienceqa_vpgm_4latent_generic") -> str:
     """
@@ -1,18 +1,29 @@
 import json
 import argparse
+import functools
+import mmap
+import os
+import shutil
 import sys
-from dataclasses import dataclass, asdict, field
 from typing import Any, Dict, List, Optional
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 try:
     import datasets
 except ImportError:
     raise ImportError("The 'datasets' library is required. Please install it using 'pip install datasets'.")
 
 
+@functools.lru_cache(maxsize=8)
 def load_prompt_template(path: str = "prompt_template.json") -> Dict[str, Any]:
     """
     Loads the prompt template JSON file.
+    The result is cached per path for the lifetime of the process and shared
+    between callers, so it must be treated as read-only.
 
     Args:
         path: Path to the JSON file.
@@ -20,6 +31,15 @@ def load_prompt_template(path: str = "prompt_template.json") -> Dict[str, Any]:
     Returns:
         The parsed JSON dictionary.
     """
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            view = memoryview(mm)
+            try:
+                return orjson.loads(view)
+            finally:
+                view.release()
+                mm.close()
     with open(path, 'r', encoding='utf-8') as f:
         return json.load(f)
 
@@ -58,33 +78,46 @@ def load_scienceqa(split: str = "train"):
     return datasets.load_dataset("derek-thomas/ScienceQA", split=split)
 
 
-@dataclass
-class QuestionMeta:
-    scienceqa_id: str
-    subject: str
-    topic: str
-    category: str
-    skill: str
-    grade: Any
+# Image-free splits are filtered once and saved under "{prefix}_{split}"
+SCIENCEQA_NOPIC_CACHE_PREFIX = "./.scienceqa_nopic"
 
 
-@dataclass
-class Observed:
-    question_text: str
-    options: List[str]
-    image_caption_optional: Optional[str]
-    text_context_optional: Optional[str]
-    lecture_optional: Optional[str]
-    retrieved_knowledge_optional: Optional[str]
+def load_image_free_split(split: str = "validation"):
+    """
+    Loads the image-free examples of a ScienceQA split, caching them on disk.
+
+    The first call filters the split and saves it; later calls load the saved
+    copy. A "source_index" column records each example's position in the
+    unfiltered split.
+
+    Args:
+        split: The dataset split to load (e.g., "train", "validation", "test").
+
+    Returns:
+        The filtered dataset split, without the image column.
+    """
+    cache_dir = f"{SCIENCEQA_NOPIC_CACHE_PREFIX}_{split}"
+    if os.path.exists(cache_dir):
+        return datasets.load_from_disk(cache_dir)
 
+    ds = load_scienceqa(split=split)
+    # Keep images as raw {bytes, path} dicts so filtering never decodes them with PIL
+    ds = ds.cast_column("image", datasets.Image(decode=False))
+    ds = ds.add_column("source_index", list(range(len(ds))))
+    ds = ds.filter(
+        lambda images: [image is None for image in images],
+        input_columns="image",
+        batched=True,
+        num_proc=4
+    )
+    ds = ds.remove_columns("image")
 
-@dataclass
-class VPGMSkeleton:
-    template_id: str
-    question_meta: Dict[str, Any]
-    observed: Dict[str, Any]
-    latent_posteriors: Dict[str, Any] = field(default_factory=dict)
-    answer_posterior: Dict[str, Any] = field(default_factory=dict)
+    # Write to a fresh temporary directory first so an interrupted save is never loaded
+    tmp_dir = cache_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    ds.save_to_disk(tmp_dir)
+    os.replace(tmp_dir, cache_dir)
+    return datasets.load_from_disk(cache_dir)
 
 
 def build_scienceqa_skeleton(example: Dict[str, Any], template_id: str, template: Dict[str, Any], override_id: Optional[str] = None) -> Dict[str, Any]:
@@ -100,6 +133,9 @@ def build_scienceqa_skeleton(example: Dict[str, Any], template_id: str, template
     Returns:
         A dictionary representing the vPGM skeleton.
     """
+    # NOTE: _build_skeletons_polars mirrors this field logic column-wise;
+    # keep the two in sync when changing any skeleton field.
+
     # Extract question_meta fields
     # scienceqa_id from 'id' or 'qid', prefer 'id'
     sqa_id = example.get("id")
@@ -113,14 +149,14 @@ def build_scienceqa_skeleton(example: Dict[str, Any], template_id: str, template
     if sqa_id is None:
         sqa_id = "unknown"
 
-    question_meta = QuestionMeta(
-        scienceqa_id=str(sqa_id),
-        subject=example.get("subject", ""),
-        topic=example.get("topic", ""),
-        category=example.get("category", ""),
-        skill=example.get("skill", ""),
-        grade=example.get("grade", -1)
-    )
+    question_meta = {
+        "scienceqa_id": str(sqa_id),
+        "subject": example.get("subject", ""),
+        "topic": example.get("topic", ""),
+        "category": example.get("category", ""),
+        "skill": example.get("skill", ""),
+        "grade": example.get("grade", -1)
+    }
 
     # Extract observed fields
     # text_context_optional from 'hint' or 'context'
@@ -133,24 +169,98 @@ def build_scienceqa_skeleton(example: Dict[str, Any], template_id: str, template
     if not isinstance(options, list):
         options = []
 
-    observed = Observed(
-        question_text=example.get("question", ""),
-        options=options,
-        image_caption_optional=None,
-        text_context_optional=text_context,
-        lecture_optional=example.get("lecture"),
-        retrieved_knowledge_optional=None
-    )
+    observed = {
+        "question_text": example.get("question", ""),
+        "options": list(options),
+        "image_caption_optional": None,
+        "text_context_optional": text_context,
+        "lecture_optional": example.get("lecture"),
+        "retrieved_knowledge_optional": None
+    }
 
-    skeleton = VPGMSkeleton(
-        template_id="scienceqa_vpgm_4latent_generic",
-        question_meta=asdict(question_meta),
-        observed=asdict(observed),
-        latent_posteriors={},
-        answer_posterior={}
-    )
+    return {
+        "template_id": "scienceqa_vpgm_4latent_generic",
+        "question_meta": question_meta,
+        "observed": observed,
+        "latent_posteriors": {},
+        "answer_posterior": {}
+    }
 
-    return asdict(skeleton)
+
+def _build_skeletons_polars(ds) -> List[Dict[str, Any]]:
+    """
+    Column-wise equivalent of build_scienceqa_skeleton over a whole dataset.
+    Any change to the skeleton fields there must be mirrored here.
+    Each skeleton field is computed as one Polars expression over the Arrow
+    columns; Python dicts are only created when the result is materialized.
+
+    Args:
+        ds: The ScienceQA dataset split.
+
+    Returns:
+        A list of vPGM skeleton dictionaries, in dataset order.
+    """
+    # Imported here so the server and client do not pay for polars at startup
+    try:
+        import polars as pl
+    except ImportError:
+        raise ImportError("The 'polars' library is required. Please install it using 'pip install polars'.")
+
+    if "image" in ds.column_names:
+        ds = ds.remove_columns("image")
+    # with_format("arrow") respects any indices mapping left by select/filter
+    df = pl.from_arrow(ds.with_format("arrow")[:])
+    columns = set(df.columns)
+
+    def col_or(name: str, default: Any, dtype: Any = pl.Utf8):
+        return pl.col(name) if name in columns else pl.lit(default, dtype=dtype)
+
+    # scienceqa_id from 'id' or 'qid', prefer 'id'
+    id_cols = [pl.col(c).cast(pl.Utf8) for c in ("id", "qid") if c in columns]
+    sqa_id = pl.coalesce(id_cols + [pl.lit("unknown")]) if id_cols else pl.lit("unknown")
+
+    # text_context_optional from 'hint' or 'context'
+    context = col_or("context", None)
+    if "hint" in columns:
+        hint = pl.col("hint")
+        text_context = pl.when(hint.is_not_null() & (hint != "")).then(hint).otherwise(context)
+    else:
+        text_context = context
+
+    if "choices" in columns:
+        options = pl.col("choices").fill_null(pl.lit([], dtype=pl.List(pl.Utf8)))
+    else:
+        options = pl.lit([], dtype=pl.List(pl.Utf8))
+
+    rows = df.select(
+        pl.struct(
+            sqa_id.alias("scienceqa_id"),
+            col_or("subject", "").alias("subject"),
+            col_or("topic", "").alias("topic"),
+            col_or("category", "").alias("category"),
+            col_or("skill", "").alias("skill"),
+            col_or("grade", -1, pl.Int64).alias("grade")
+        ).alias("question_meta"),
+        pl.struct(
+            col_or("question", "").alias("question_text"),
+            options.alias("options"),
+            pl.lit(None, dtype=pl.Utf8).alias("image_caption_optional"),
+            text_context.alias("text_context_optional"),
+            col_or("lecture", None).alias("lecture_optional"),
+            pl.lit(None, dtype=pl.Utf8).alias("retrieved_knowledge_optional")
+        ).alias("observed")
+    ).to_dicts()
+
+    return [
+        {
+            "template_id": "scienceqa_vpgm_4latent_generic",
+            "question_meta": row["question_meta"],
+            "observed": row["observed"],
+            "latent_posteriors": {},
+            "answer_posterior": {}
+        }
+        for row in rows
+    ]
 
 
 def build_skeletons_for_split(split: str = "validation", template_id: str = "scienceqa_vpgm_4latent_generic") -> Dict[str, Any]:
@@ -172,10 +282,7 @@ def build_skeletons_for_split(split: str = "validation", template_id: str = "sci
     # Load dataset
     ds = load_scienceqa(split=split)
 
-    instances = []
-    for example in ds:
-        skeleton = build_scienceqa_skeleton(example, template_id, full_template)
-        instances.append(skeleton)
+    instances = _build_skeletons_polars(ds)
 
     return {
         "template_id": template_id,
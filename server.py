@@ -1,17 +1,29 @@
+import asyncio
 import json
 import logging
+import os
 from typing import List, Optional, Dict, Any
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Import our existing modules
-from scienceqa_vpgm_loader import load_scienceqa, load_prompt_template, build_scienceqa_skeleton, get_template_by_id
+from scienceqa_vpgm_loader import load_image_free_split, load_prompt_template, build_scienceqa_skeleton, get_template_by_id
 from vpgm_llm_client import infer_vpgm_for_skeleton
 
 # Configure logging to print to terminal
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger("vpgm_monitor")
+# Set VPGM_DEBUG=1 to also dump every full inference result to RESULT_LOG_PATH
+if os.environ.get("VPGM_DEBUG", "").strip().lower() in ("1", "true", "yes"):
+    logger.setLevel(logging.DEBUG)
+
+RESULT_LOG_PATH = "vpgm_results.log"
 
 app = FastAPI(title="ScienceQA vPGM Explorer")
 
@@ -28,33 +40,82 @@ app.add_middleware(
 STATE = {
     "dataset": None,
     "template": None,
-    "template_id": "scienceqa_vpgm_4latent_generic"
+    "template_id": "scienceqa_vpgm_4latent_generic",
+    "source_indices": [],
+    "position_by_source_index": {},
+    "id_index": {},
+    "question_lower_bytes": [],
+    "result_log_queue": None,
+    "result_log_task": None
 }
 
+def _append_result_log(entry: bytes):
+    with open(RESULT_LOG_PATH, "ab") as f:
+        f.write(entry)
+
+async def _result_log_writer(queue: asyncio.Queue):
+    # Drains queued result dumps off the request path; file I/O runs in a worker thread
+    while True:
+        entry = await queue.get()
+        try:
+            await asyncio.to_thread(_append_result_log, entry)
+        except OSError as e:
+            logger.error(f"Failed to write result log: {e}")
+        finally:
+            queue.task_done()
+
 @app.on_event("startup")
 async def startup_event():
     logger.info("Loading ScienceQA dataset and templates... This may take a moment.")
     # Load validation split by default for exploration
-    STATE["dataset"] = load_scienceqa(split="validation")
+    STATE["dataset"] = ds = load_image_free_split(split="validation")
     STATE["template"] = load_prompt_template()
+
+    # Index the dataset once so requests never have to scan it.
+    # Question IDs ("idx_{n}") keep referring to positions in the unfiltered split.
+    # Each column is pulled out as a plain list once; per-item access on a
+    # datasets Column would go back through Arrow every time.
+    source_indices = list(ds["source_index"])
+    STATE["source_indices"] = source_indices
+    STATE["position_by_source_index"] = {n: i for i, n in enumerate(source_indices)}
+    id_index = {}
+    for key in ("id", "qid"):
+        if key in ds.column_names:
+            for i, real_id in enumerate(list(ds[key])):
+                if real_id is not None:
+                    id_index.setdefault(str(real_id), i)
+    STATE["id_index"] = id_index
+    # Case-folded UTF-8 question text so search is a C-level bytes containment check
+    questions = list(ds["question"])
+    STATE["question_lower_bytes"] = [(q or "").casefold().encode("utf-8") for q in questions]
     logger.info(f"Loaded {len(STATE['dataset'])} examples from ScienceQA validation split.")
 
+    queue = asyncio.Queue()
+    STATE["result_log_queue"] = queue
+    STATE["result_log_task"] = asyncio.create_task(_result_log_writer(queue))
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    queue = STATE["result_log_queue"]
+    task = STATE["result_log_task"]
+    if queue is not None and task is not None:
+        await queue.join()
+        task.cancel()
+
 def get_example_by_id(sqa_id: str):
-    # ID format: "idx_{index}"
+    # ID format: "idx_{index}", where index is the position in the unfiltered split
     if sqa_id.startswith("idx_"):
         try:
-            idx = int(sqa_id.split("_")[1])
-            ds = STATE["dataset"]
-            if 0 <= idx < len(ds):
-                return ds[idx]
+            idx = STATE["position_by_source_index"].get(int(sqa_id.split("_")[1]))
+            if idx is not None:
+                return STATE["dataset"][idx]
         except (ValueError, IndexError):
             pass
             
-    # Fallback to searching if we ever have real IDs
-    ds = STATE["dataset"]
-    for ex in ds:
-        if str(ex.get("id")) == sqa_id or str(ex.get("qid")) == sqa_id:
-            return ex
+    # Fallback to the real-ID index built at startup
+    idx = STATE["id_index"].get(sqa_id)
+    if idx is not None:
+        return STATE["dataset"][idx]
     return None
 
 @app.get("/api/questions")
@@ -63,39 +124,28 @@ async def list_questions(page: int = 1, limit: int = 20, search: Optional[str] =
     if not ds:
         raise HTTPException(status_code=503, detail="Dataset not loaded")
 
-    # Filter out images first (as per requirement) and apply search
-    filtered_indices = []
-    search_lower = search.lower() if search else None
-    
-    # Iterate to filter
-    # Note: For 4k items this is fast enough.
-    for i in range(len(ds)):
-        ex = ds[i]
-        
-        # Requirement: Omit questions with images
-        if ex.get("image") is not None:
-            continue
-            
-        # Search filter
-        if search_lower:
-            q_text = ex.get("question", "")
-            # Check question text
-            if search_lower not in q_text.lower():
-                continue
-                
-        filtered_indices.append(i)
-            
+    # Images are already filtered out of the dataset (as per requirement); apply search
+    if search:
+        needle = search.casefold().encode("utf-8")
+        filtered_indices = [
+            i for i, q in enumerate(STATE["question_lower_bytes"])
+            if needle in q
+        ]
+    else:
+        filtered_indices = range(len(ds))
+
     # Pagination
     total_filtered = len(filtered_indices)
     start = (page - 1) * limit
     end = start + limit
     page_indices = filtered_indices[start:end]
     
+    source_indices = STATE["source_indices"]
     results = []
     for i in page_indices:
         ex = ds[i]
         results.append({
-            "id": f"idx_{i}",
+            "id": f"idx_{source_indices[i]}",
             "question": ex.get("question"),
             "subject": ex.get("subject"),
             "topic": ex.get("topic")
@@ -123,6 +173,7 @@ async def get_question_details(sqa_id: str):
     ex_dict = dict(ex)
     if "image" in ex_dict:
         del ex_dict["image"]
+    ex_dict.pop("source_index", None)
     
     return {
         "raw_example": ex_dict,
@@ -147,11 +198,15 @@ async def run_inference(sqa_id: str):
             template_id=STATE["template_id"]
         )
         
-        # MONITORING: Print full JSON to terminal
-        print("\n" + "="*40)
-        print(f"FULL JSON RESPONSE FOR {sqa_id}:")
-        print(json.dumps(result, indent=2, ensure_ascii=False))
-        print("="*40 + "\n")
+        # MONITORING: Dump full JSON to the result log (debug only)
+        if logger.isEnabledFor(logging.DEBUG) and STATE["result_log_queue"] is not None:
+            if orjson is not None:
+                body = orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            else:
+                body = json.dumps(result, indent=2, ensure_ascii=False).encode("utf-8")
+            header = f"{'=' * 40}\nFULL JSON RESPONSE FOR {sqa_id}:\n".encode("utf-8")
+            STATE["result_log_queue"].put_nowait(header + body + b"\n")
+            logger.debug(f"Queued full JSON response for {sqa_id} to {RESULT_LOG_PATH}")
         
         return result
         
@@ -0,0 +1,51 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+datasets = pytest.importorskip("datasets")
+pytest.importorskip("polars")
+
+from scienceqa_vpgm_loader import _build_skeletons_polars, build_scienceqa_skeleton
+
+
+TEMPLATE_ID = "scienceqa_vpgm_4latent_generic"
+
+
+def make_split(n: int = 6):
+    """Small ScienceQA-shaped split with nulls and empty strings in the optional fields."""
+    return datasets.Dataset.from_dict({
+        "question": ["q0", "q1", None, "q3", "q4", "q5"][:n],
+        "choices": [["a", "b"], [], None, ["c"], ["d"], ["e"]][:n],
+        "hint": ["h", "", None, "x", "", ""][:n],
+        "context": ["c", None, "cc", "", "z", ""][:n],
+        "lecture": ["l", None, "", "l", "l", "l"][:n],
+        "subject": ["s"] * n,
+        "topic": ["t"] * n,
+        "category": ["c"] * n,
+        "skill": ["k"] * n,
+        "grade": ["g1"] * n,
+        "answer": [0] * n
+    })
+
+
+def expected_skeletons(ds):
+    return [build_scienceqa_skeleton(ex, TEMPLATE_ID, None) for ex in ds]
+
+
+def test_polars_skeletons_match_per_row_builder():
+    ds = make_split()
+    assert _build_skeletons_polars(ds) == expected_skeletons(ds)
+
+
+def test_polars_skeletons_respect_indices_mapping():
+    ds = make_split().select([5, 1, 3])
+    assert _build_skeletons_polars(ds) == expected_skeletons(ds)
+
+
+def test_polars_skeletons_id_fallbacks_and_missing_columns():
+    ds = make_split().remove_columns(["skill", "grade", "hint"])
+    ds = ds.add_column("id", [None, 5, 3, None, 1, 2]).add_column("qid", [7, None, None, None, 1, 1])
+    assert _build_skeletons_polars(ds) == expected_skeletons(ds)
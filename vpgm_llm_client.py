@@ -1,23 +1,82 @@
+import asyncio
+import concurrent.futures
+import hashlib
 import json
+import math
 import os
+import random
 import time
-from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 from dataclasses import dataclass
 import dotenv
 dotenv.load_dotenv()
-from openai import OpenAI, APIError
+from openai import OpenAI, AsyncOpenAI, APIError, RateLimitError
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+try:
+    import diskcache
+except ImportError:
+    diskcache = None
+
+# On-disk store of validated results; falls back to an in-process LRU without diskcache.
+RESULT_CACHE_DIR = ".vpgm_cache"
+RESULT_CACHE_MAX_ENTRIES = 1024
+_RESULT_CACHE: Any = None
 
 from scienceqa_vpgm_loader import load_prompt_template, get_template_by_id
 from build_vpgm_llm_prompt import build_vpgm_prompt, build_prompt_for_instance
 
+REQUIRED_INSTANCE_KEYS = ("template_id", "question_meta", "observed", "latent_posteriors", "answer_posterior")
+REQUIRED_LATENT_SUBKEYS = ("state_probabilities", "justification")
+
+@dataclass(frozen=True)
+class TemplateSpec:
+    """
+    The parts of a template that response validation depends on, resolved once.
+    """
+    expected_template_id: Optional[str]
+    latent_names: Tuple[str, ...]
+
+# Compiled specs keyed by id(template); the template is kept so its id cannot be reused.
+_TEMPLATE_SPEC_CACHE: Dict[int, Tuple[Dict[str, Any], TemplateSpec]] = {}
+
+# Process-wide client, so its HTTP connection pool is reused across calls.
+_CLIENT: Optional[OpenAI] = None
+
 def get_openai_client() -> Any:
     """
     Configures and returns an openai API client.
-    Reads OPENAI_API_KEY from environment.
+    Reads OPENAI_API_KEY from environment on first use; the client is then
+    cached for the lifetime of the process.
     
     Returns:
         OpenAI client instance.
         
+    Raises:
+        RuntimeError: If OPENAI_API_KEY is not set.
+    """
+    global _CLIENT
+    if _CLIENT is None:
+        api_key = os.environ.get("OPENAI_API_KEY")
+        if not api_key:
+            raise RuntimeError("OPENAI_API_KEY environment variable is not set.")
+        _CLIENT = OpenAI(api_key=api_key)
+    return _CLIENT
+
+def get_async_openai_client() -> Any:
+    """
+    Configures and returns an asyncio openai API client.
+    Reads OPENAI_API_KEY from environment.
+    
+    Returns:
+        AsyncOpenAI client instance.
+        
     Raises:
         RuntimeError: If OPENAI_API_KEY is not set.
     """
@@ -25,7 +84,127 @@ def get_openai_client() -> Any:
     if not api_key:
         raise RuntimeError("OPENAI_API_KEY environment variable is not set.")
     
-    return OpenAI(api_key=api_key)
+    return AsyncOpenAI(api_key=api_key)
+
+def call_llm_with_prompt_stream(
+    prompt: str,
+    model: str = "gpt-4.1",
+    temperature: float = 0.0,
+    max_tokens: int = 2048
+) -> Iterator[str]:
+    """
+    Calls the LLM with the given prompt and yields the response as it streams in.
+    Closing the generator early closes the underlying HTTP stream.
+    
+    Args:
+        prompt: The full text prompt.
+        model: The model identifier.
+        temperature: Sampling temperature.
+        max_tokens: Maximum tokens to generate.
+        
+    Yields:
+        Successive content fragments of the assistant's response.
+        
+    Raises:
+        RuntimeError: If the API call fails.
+    """
+    client = get_openai_client()
+    try:
+        stream = client.chat.completions.create(
+            model=model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True
+        )
+    except Exception as e:
+        raise RuntimeError(f"LLM call failed: {e}") from e
+        
+    try:
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            content = chunk.choices[0].delta.content
+            if content:
+                yield content
+    except Exception as e:
+        raise RuntimeError(f"LLM call failed: {e}") from e
+    finally:
+        stream.close()
+
+def _scan_json_object(text: str, state: Dict[str, Any]) -> int:
+    """
+    Advances a brace-matching scan over text, respecting JSON string literals.
+    The scan state is kept in `state` so that text can be fed in fragments.
+    
+    Args:
+        text: The next fragment of text to scan.
+        state: Scan state as returned by _new_scan_state(). "start" records the
+            offset of the opening '{' and "scanned" the number of characters seen.
+        
+    Returns:
+        The index in `text` of the brace closing the first top-level JSON object,
+        or -1 if it has not been closed yet.
+    """
+    depth = state["depth"]
+    in_string = state["in_string"]
+    escaped = state["escaped"]
+    offset = state["scanned"]
+    result = -1
+    
+    for i, c in enumerate(text):
+        if in_string:
+            if escaped:
+                escaped = False
+            elif c == "\\":
+                escaped = True
+            elif c == '"':
+                in_string = False
+        elif c == "{":
+            if depth == 0 and state["start"] == -1:
+                state["start"] = offset + i
+            depth += 1
+        elif depth == 0:
+            # Text before the object (prose, code fences) is not part of the JSON
+            continue
+        elif c == '"':
+            in_string = True
+        elif c == "}":
+            depth -= 1
+            if depth == 0:
+                result = i
+                break
+                
+    state["depth"] = depth
+    state["in_string"] = in_string
+    state["escaped"] = escaped
+    state["scanned"] = offset + len(text)
+    return result
+
+def _new_scan_state() -> Dict[str, Any]:
+    """
+    Returns a fresh scan state for _scan_json_object.
+    """
+    return {"start": -1, "depth": 0, "in_string": False, "escaped": False, "scanned": 0}
+
+def _collect_until_json_closes(content: str, parts: List[str], state: Dict[str, Any]) -> bool:
+    """
+    Appends a streamed fragment to parts, truncated at the end of the JSON object.
+    
+    Args:
+        content: The next content fragment from the stream.
+        parts: Fragments collected so far; appended to in place.
+        state: Scan state as returned by _new_scan_state().
+        
+    Returns:
+        True once the first top-level JSON object is complete.
+    """
+    end = _scan_json_object(content, state)
+    if end != -1:
+        parts.append(content[:end + 1])
+        return True
+    parts.append(content)
+    return False
 
 def call_llm_with_prompt(
     prompt: str,
@@ -35,6 +214,8 @@ def call_llm_with_prompt(
 ) -> str:
     """
     Calls the LLM with the given prompt.
+    Streams the response and stops reading as soon as the first top-level
+    JSON object is complete, so trailing tokens are never waited for.
     
     Args:
         prompt: The full text prompt.
@@ -48,53 +229,134 @@ def call_llm_with_prompt(
     Raises:
         RuntimeError: If the API call fails.
     """
-    client = get_openai_client()
+    parts = []
+    state = _new_scan_state()
+    stream = call_llm_with_prompt_stream(
+        prompt,
+        model=model,
+        temperature=temperature,
+        max_tokens=max_tokens
+    )
     try:
-        response = client.chat.completions.create(
+        for chunk in stream:
+            if _collect_until_json_closes(chunk, parts, state):
+                break
+    finally:
+        stream.close()
+        
+    return "".join(parts)
+
+async def call_llm_with_prompt_async(
+    prompt: str,
+    client: Any,
+    model: str = "gpt-4.1",
+    temperature: float = 0.0,
+    max_tokens: int = 2048
+) -> str:
+    """
+    Async counterpart of call_llm_with_prompt using a shared AsyncOpenAI client.
+    
+    Args:
+        prompt: The full text prompt.
+        client: AsyncOpenAI client instance.
+        model: The model identifier.
+        temperature: Sampling temperature.
+        max_tokens: Maximum tokens to generate.
+        
+    Returns:
+        The content of the assistant's response.
+        
+    Raises:
+        RuntimeError: If the API call fails.
+    """
+    try:
+        stream = await client.chat.completions.create(
             model=model,
             messages=[{"role": "user", "content": prompt}],
             temperature=temperature,
-            max_tokens=max_tokens
+            max_tokens=max_tokens,
+            stream=True
         )
-        return response.choices[0].message.content
     except Exception as e:
-        raise RuntimeError(f"LLM call failed: {e}")
+        raise RuntimeError(f"LLM call failed: {e}") from e
+        
+    parts = []
+    state = _new_scan_state()
+    try:
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            content = chunk.choices[0].delta.content
+            if content and _collect_until_json_closes(content, parts, state):
+                break
+    except Exception as e:
+        raise RuntimeError(f"LLM call failed: {e}") from e
+    finally:
+        await stream.close()
+        
+    return "".join(parts)
 
-def extract_json_from_text(raw_output: str) -> str:
+def _find_json(raw_output: str) -> str:
     """
-    Extracts JSON string from raw text output.
+    Locates the first top-level JSON object in raw text with a single scan.
     
     Args:
         raw_output: The raw string from the LLM.
         
     Returns:
-        A clean JSON string.
+        The substring spanning the object, from its '{' to the matching '}'.
+        
+    Raises:
+        ValueError: If no complete JSON object is found.
+    """
+    state = _new_scan_state()
+    end_idx = _scan_json_object(raw_output, state)
+    if end_idx == -1:
+        raise ValueError("No JSON object found in output.")
+    return raw_output[state["start"] : end_idx + 1]
+
+def _extract_and_parse_json(raw_output: str) -> Tuple[str, Any]:
+    """
+    Locates the first JSON object in raw text and parses it.
+    
+    Args:
+        raw_output: The raw string from the LLM.
+        
+    Returns:
+        A tuple of (extracted JSON string, parsed object).
         
     Raises:
         ValueError: If JSON cannot be found or parsed.
     """
-    # First try parsing as is
+    # Common case: the whole response is valid JSON, so one C-level parse suffices
     try:
-        json.loads(raw_output)
-        return raw_output
+        return raw_output, _json_loads(raw_output)
     except json.JSONDecodeError:
         pass
-    
-    # Heuristic extraction
-    start_idx = raw_output.find('{')
-    end_idx = raw_output.rfind('}')
-    
-    if start_idx == -1 or end_idx == -1 or start_idx > end_idx:
-        raise ValueError("No JSON object found in output.")
         
-    candidate = raw_output[start_idx : end_idx + 1]
+    # Otherwise scan for the first complete object (ignores trailing prose)
+    candidate = _find_json(raw_output)
     
     try:
-        json.loads(candidate)
-        return candidate
+        return candidate, _json_loads(candidate)
     except json.JSONDecodeError as e:
         raise ValueError(f"Extracted text is not valid JSON: {e}")
 
+def extract_json_from_text(raw_output: str) -> str:
+    """
+    Extracts JSON string from raw text output.
+    
+    Args:
+        raw_output: The raw string from the LLM.
+        
+    Returns:
+        A clean JSON string.
+        
+    Raises:
+        ValueError: If JSON cannot be found or parsed.
+    """
+    return _extract_and_parse_json(raw_output)[0]
+
 def parse_vpgm_instance(raw_output: str) -> Dict[str, Any]:
     """
     Parses the raw LLM output into a dictionary.
@@ -108,8 +370,7 @@ def parse_vpgm_instance(raw_output: str) -> Dict[str, Any]:
     Raises:
         ValueError: If parsing fails.
     """
-    json_str = extract_json_from_text(raw_output)
-    return json.loads(json_str)
+    return _extract_and_parse_json(raw_output)[1]
 
 def validate_probability_dict(
     probs: Dict[str, float],
@@ -128,60 +389,82 @@ def validate_probability_dict(
     if not probs:
         raise ValueError("Probability dictionary is empty.")
         
-    total = 0.0
     for k, v in probs.items():
         if not isinstance(v, (int, float)):
             raise ValueError(f"Value for '{k}' is not a number: {v}")
         if not (0.0 <= v <= 1.0):
             raise ValueError(f"Value for '{k}' is out of range [0, 1]: {v}")
-        total += v
-        
+            
+    # Exact summation so many small probabilities do not drift past the tolerance
+    total = math.fsum(probs.values())
     if abs(total - 1.0) > tolerance:
         raise ValueError(f"Probabilities sum to {total}, expected 1.0 (tolerance {tolerance}).")
 
+def get_template_spec(template: Dict[str, Any]) -> TemplateSpec:
+    """
+    Returns the compiled validation spec for a template, building it on first use.
+    
+    Args:
+        template: The template definition.
+        
+    Returns:
+        The TemplateSpec for the template.
+    """
+    key = id(template)
+    cached = _TEMPLATE_SPEC_CACHE.get(key)
+    if cached is not None and cached[0] is template:
+        return cached[1]
+        
+    expected_id = template.get("id")
+    # Also check inside instance_fields if present, as per instructions
+    if not expected_id and "instance_fields" in template:
+        expected_id = template["instance_fields"].get("template_id")
+        
+    spec = TemplateSpec(
+        expected_template_id=expected_id,
+        latent_names=tuple(template.get("instance_fields", {}).get("latent_posteriors", {}))
+    )
+    _TEMPLATE_SPEC_CACHE[key] = (template, spec)
+    return spec
+
 def validate_vpgm_instance_against_template(
     instance: Dict[str, Any],
-    template: Dict[str, Any]
+    template: Union[TemplateSpec, Dict[str, Any]]
 ) -> None:
     """
     Validates the parsed instance against the template structure.
     
     Args:
         instance: The parsed vPGM instance.
-        template: The template definition.
+        template: The compiled TemplateSpec, or the template definition.
         
     Raises:
         ValueError: If validation fails.
     """
+    spec = template if isinstance(template, TemplateSpec) else get_template_spec(template)
+    
     # Top level keys
-    required_keys = ["template_id", "question_meta", "observed", "latent_posteriors", "answer_posterior"]
-    for key in required_keys:
+    for key in REQUIRED_INSTANCE_KEYS:
         if key not in instance:
             raise ValueError(f"Missing top-level key: {key}")
             
     # Template ID check
-    expected_id = template.get("id")
-    # Also check inside instance_fields if present, as per instructions
-    if not expected_id and "instance_fields" in template:
-        expected_id = template["instance_fields"].get("template_id")
-        
+    expected_id = spec.expected_template_id
     if instance["template_id"] != expected_id:
         raise ValueError(f"Template ID mismatch. Expected '{expected_id}', got '{instance['template_id']}'")
         
     # Latent variables
-    template_latents = template.get("instance_fields", {}).get("latent_posteriors", {})
     instance_latents = instance["latent_posteriors"]
     
-    for latent_name in template_latents:
+    for latent_name in spec.latent_names:
         if latent_name not in instance_latents:
             raise ValueError(f"Missing latent variable: {latent_name}")
             
         latent_data = instance_latents[latent_name]
-        if "state_probabilities" not in latent_data:
-            raise ValueError(f"Missing 'state_probabilities' for latent: {latent_name}")
-        if "justification" not in latent_data:
-            raise ValueError(f"Missing 'justification' for latent: {latent_name}")
-            
+        for subkey in REQUIRED_LATENT_SUBKEYS:
+            if subkey not in latent_data:
+                raise ValueError(f"Missing '{subkey}' for latent: {latent_name}")
+                
         validate_probability_dict(latent_data["state_probabilities"])
         
     # Answer posterior
@@ -200,16 +483,143 @@ def validate_vpgm_instance_against_template(
         if selected not in options:
             raise ValueError(f"Selected answer '{selected}' is not in observed options: {options}")
 
+def _get_result_cache() -> Any:
+    """
+    Returns the process-wide inference result cache, opening it on first use.
+    
+    Returns:
+        A diskcache.Cache if diskcache is installed, otherwise an OrderedDict
+        used as an LRU bounded to RESULT_CACHE_MAX_ENTRIES.
+    """
+    global _RESULT_CACHE
+    if _RESULT_CACHE is None:
+        if diskcache is not None:
+            _RESULT_CACHE = diskcache.Cache(RESULT_CACHE_DIR)
+        else:
+            _RESULT_CACHE = OrderedDict()
+    return _RESULT_CACHE
+
+def _result_cache_key(prompt: str, model: str) -> str:
+    """
+    Builds the result cache key for a prompt/model pair.
+    
+    Args:
+        prompt: The full text prompt.
+        model: The model identifier.
+        
+    Returns:
+        The cache key string.
+    """
+    return hashlib.blake2b(prompt.encode("utf-8"), digest_size=16).hexdigest() + ":" + model
+
+def _cache_lookup(key: str) -> Optional[Dict[str, Any]]:
+    """
+    Returns a fresh copy of the cached instance for key, or None on a miss.
+    """
+    cache = _get_result_cache()
+    cached = cache.get(key)
+    if cached is None:
+        return None
+    if isinstance(cache, OrderedDict):
+        cache.move_to_end(key)
+    return _json_loads(cached)
+
+def _cache_store(key: str, instance: Dict[str, Any]) -> None:
+    """
+    Stores a validated instance in the result cache.
+    """
+    cache = _get_result_cache()
+    cache[key] = json.dumps(instance, ensure_ascii=False)
+    if isinstance(cache, OrderedDict):
+        cache.move_to_end(key)
+        while len(cache) > RESULT_CACHE_MAX_ENTRIES:
+            cache.popitem(last=False)
+
+# Upper bound on the exponential part of the retry backoff and on Retry-After waits.
+RETRY_MAX_SLEEP_SECONDS = 30.0
+
+def _retry_delay(error: Exception, attempt: int, retry_sleep_seconds: float) -> float:
+    """
+    Computes how long to wait before retrying after a failed attempt.
+    
+    Parse and validation failures (ValueError) are retried immediately. Rate
+    limits honor the provider's Retry-After header when present, capped at
+    RETRY_MAX_SLEEP_SECONDS. Everything
+    else uses truncated exponential backoff with jitter.
+    
+    Args:
+        error: The exception raised by the failed attempt.
+        attempt: Zero-based index of the failed attempt.
+        retry_sleep_seconds: Base sleep time.
+        
+    Returns:
+        The number of seconds to sleep.
+    """
+    if isinstance(error, ValueError):
+        return 0.0
+        
+    # LLM call failures are wrapped in RuntimeError; inspect the original error
+    cause = error.__cause__ if error.__cause__ is not None else error
+    if isinstance(cause, RateLimitError) and cause.response is not None:
+        retry_after = cause.response.headers.get("retry-after")
+        if retry_after is not None:
+            try:
+                return min(max(0.0, float(retry_after)), RETRY_MAX_SLEEP_SECONDS)
+            except ValueError:
+                pass
+                
+    backoff = min(retry_sleep_seconds * (2 ** attempt), RETRY_MAX_SLEEP_SECONDS)
+    return backoff * (0.5 + random.random())
+
+def _prepare_inference(
+    skeleton: Dict[str, Any],
+    template: Dict[str, Any],
+    model: str,
+    use_cache: bool
+) -> Tuple[TemplateSpec, str, str, Optional[Dict[str, Any]]]:
+    """
+    Builds the prompt for a skeleton and looks it up in the result cache.
+    
+    Returns:
+        A tuple of (template spec, prompt, cache key, cached instance or None).
+    """
+    spec = get_template_spec(template)
+    prompt = build_vpgm_prompt(skeleton, template)
+    cache_key = _result_cache_key(prompt, model)
+    cached = _cache_lookup(cache_key) if use_cache else None
+    return spec, prompt, cache_key, cached
+
+def _finish_inference(
+    raw_output: str,
+    spec: TemplateSpec,
+    cache_key: str,
+    use_cache: bool
+) -> Dict[str, Any]:
+    """
+    Parses and validates a raw LLM response, caching it once it passes.
+    
+    Raises:
+        ValueError: If parsing or validation fails.
+    """
+    instance = parse_vpgm_instance(raw_output)
+    validate_vpgm_instance_against_template(instance, spec)
+    if use_cache:
+        _cache_store(cache_key, instance)
+    return instance
+
 def infer_vpgm_for_skeleton(
     skeleton: Dict[str, Any],
     template_full: Dict[str, Any],
     template_id: str = "scienceqa_vpgm_4latent_generic",
     model: str = "gpt-4.1",
     max_retries: int = 3,
-    retry_sleep_seconds: float = 1.0
+    retry_sleep_seconds: float = 1.0,
+    use_cache: bool = True
 ) -> Dict[str, Any]:
     """
     Performs full inference for a single skeleton.
+    Validated results are cached by prompt hash and model, so repeated
+    requests for the same skeleton do not call the LLM again.
     
     Args:
         skeleton: The input skeleton.
@@ -217,7 +627,8 @@ def infer_vpgm_for_skeleton(
         template_id: The template ID.
         model: The LLM model to use.
         max_retries: Number of retries on failure.
-        retry_sleep_seconds: Sleep time between retries.
+        retry_sleep_seconds: Base sleep time for the exponential retry backoff.
+        use_cache: Whether to read and write the result cache.
         
     Returns:
         The validated vPGM instance.
@@ -226,58 +637,263 @@ def infer_vpgm_for_skeleton(
         RuntimeError: If inference fails after all retries.
     """
     template = get_template_by_id(template_full, template_id)
-    prompt = build_vpgm_prompt(skeleton, template)
+    spec, prompt, cache_key, cached = _prepare_inference(skeleton, template, model, use_cache)
     # print (prompt)
+    if cached is not None:
+        return cached
     last_error = None
     
     for attempt in range(max_retries):
         try:
             raw_output = call_llm_with_prompt(prompt, model=model)
-            instance = parse_vpgm_instance(raw_output)
-            validate_vpgm_instance_against_template(instance, template)
-            return instance
+            return _finish_inference(raw_output, spec, cache_key, use_cache)
+        except Exception as e:
+            last_error = e
+            if attempt < max_retries - 1:
+                delay = _retry_delay(e, attempt, retry_sleep_seconds)
+                if delay > 0:
+                    time.sleep(delay)
+                
+    raise RuntimeError(f"Inference failed after {max_retries} retries. Last error: {last_error}")
+
+async def _infer_one(
+    skeleton: Dict[str, Any],
+    template: Dict[str, Any],
+    client: Any,
+    sem: asyncio.Semaphore,
+    model: str = "gpt-4.1",
+    max_retries: int = 3,
+    retry_sleep_seconds: float = 1.0,
+    use_cache: bool = True
+) -> Dict[str, Any]:
+    """
+    Async counterpart of infer_vpgm_for_skeleton for use in batch inference.
+    
+    Args:
+        skeleton: The input skeleton.
+        template: The resolved template definition.
+        client: AsyncOpenAI client instance.
+        sem: Semaphore bounding the number of in-flight requests.
+        model: The LLM model to use.
+        max_retries: Number of retries on failure.
+        retry_sleep_seconds: Base sleep time for the exponential retry backoff.
+        use_cache: Whether to read and write the result cache.
+        
+    Returns:
+        The validated vPGM instance.
+        
+    Raises:
+        RuntimeError: If inference fails after all retries.
+    """
+    spec, prompt, cache_key, cached = _prepare_inference(skeleton, template, model, use_cache)
+    if cached is not None:
+        return cached
+    last_error = None
+    
+    for attempt in range(max_retries):
+        try:
+            async with sem:
+                raw_output = await call_llm_with_prompt_async(prompt, client, model=model)
+            return _finish_inference(raw_output, spec, cache_key, use_cache)
         except Exception as e:
             last_error = e
             if attempt < max_retries - 1:
-                time.sleep(retry_sleep_seconds)
+                delay = _retry_delay(e, attempt, retry_sleep_seconds)
+                if delay > 0:
+                    await asyncio.sleep(delay)
                 
     raise RuntimeError(f"Inference failed after {max_retries} retries. Last error: {last_error}")
 
+async def infer_vpgm_for_instances_async(
+    skeletons: List[Dict[str, Any]],
+    template_id: str = "scienceqa_vpgm_4latent_generic",
+    model: str = "gpt-4.1",
+    max_concurrency: int = 16
+) -> List[Dict[str, Any]]:
+    """
+    Runs inference for a batch of skeletons concurrently.
+    
+    Args:
+        skeletons: List of skeleton dictionaries.
+        template_id: Template ID.
+        model: LLM model.
+        max_concurrency: Maximum number of concurrent LLM requests.
+        
+    Returns:
+        List of validated instances, in the same order as the skeletons.
+    """
+    template_full = load_prompt_template()
+    template = get_template_by_id(template_full, template_id)
+    client = get_async_openai_client()
+    sem = asyncio.Semaphore(max_concurrency)
+    
+    try:
+        # If one skeleton fails after its retries, the RuntimeError propagates
+        # out of gather, matching the strict behaviour of the serial version.
+        return await asyncio.gather(*[
+            _infer_one(skeleton, template, client, sem, model=model)
+            for skeleton in skeletons
+        ])
+    finally:
+        await client.close()
+
 def infer_vpgm_for_instances(
     skeletons: List[Dict[str, Any]],
     template_id: str = "scienceqa_vpgm_4latent_generic",
-    model: str = "gpt-4.1"
+    model: str = "gpt-4.1",
+    max_concurrency: int = 16
 ) -> List[Dict[str, Any]]:
     """
     Runs inference for a batch of skeletons.
+    Synchronous wrapper around infer_vpgm_for_instances_async. If an event loop
+    is already running in this thread (e.g. Jupyter, FastAPI), the batch runs
+    on its own loop in a worker thread instead.
     
     Args:
         skeletons: List of skeleton dictionaries.
         template_id: Template ID.
         model: LLM model.
+        max_concurrency: Maximum number of concurrent LLM requests.
         
     Returns:
         List of validated instances.
     """
-    template_full = load_prompt_template()
-    results = []
-    
-    for skeleton in skeletons:
-        # We let exceptions propagate or could catch them here. 
-        # Instructions imply returning a list, but if one fails, 
-        # infer_vpgm_for_skeleton raises RuntimeError. 
-        # We will let it raise as per typical strict batch processing or 
-        # if the user wanted partial results they would have specified error handling here.
-        # Given "Does not print anything", we assume strict failure or propagation.
-        instance = infer_vpgm_for_skeleton(
-            skeleton, 
-            template_full, 
-            template_id=template_id, 
-            model=model
+    def run() -> List[Dict[str, Any]]:
+        return asyncio.run(infer_vpgm_for_instances_async(
+            skeletons,
+            template_id=template_id,
+            model=model,
+            max_concurrency=max_concurrency
+        ))
+        
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return run()
+        
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(run).result()
+
+def submit_batch(
+    skeletons: List[Dict[str, Any]],
+    template_full: Dict[str, Any],
+    template_id: str = "scienceqa_vpgm_4latent_generic",
+    model: str = "gpt-4.1",
+    temperature: float = 0.0,
+    max_tokens: int = 2048
+) -> str:
+    """
+    Submits a batch of skeletons to the OpenAI Batch API for offline inference.
+    Each request's custom_id is "idx_{position}" in the skeletons list.
+    
+    Args:
+        skeletons: List of skeleton dictionaries.
+        template_full: The full template object.
+        template_id: The template ID.
+        model: The LLM model to use.
+        temperature: Sampling temperature.
+        max_tokens: Maximum tokens to generate.
+        
+    Returns:
+        The ID of the created batch.
+        
+    Raises:
+        RuntimeError: If the upload or batch creation fails.
+    """
+    template = get_template_by_id(template_full, template_id)
+    lines = []
+    for i, skeleton in enumerate(skeletons):
+        request = {
+            "custom_id": f"idx_{i}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": model,
+                "messages": [{"role": "user", "content": build_vpgm_prompt(skeleton, template)}],
+                "temperature": temperature,
+                "max_tokens": max_tokens
+            }
+        }
+        lines.append(json.dumps(request, ensure_ascii=False))
+    payload = ("\n".join(lines) + "\n").encode("utf-8")
+    
+    client = get_openai_client()
+    try:
+        input_file = client.files.create(file=("vpgm_batch.jsonl", payload), purpose="batch")
+        batch = client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h"
         )
-        results.append(instance)
+    except Exception as e:
+        raise RuntimeError(f"Batch submission failed: {e}")
+    return batch.id
+
+def fetch_batch(
+    batch_id: str,
+    template_full: Dict[str, Any],
+    template_id: str = "scienceqa_vpgm_4latent_generic",
+    poll_seconds: float = 30.0
+) -> Dict[str, Any]:
+    """
+    Waits for a batch submitted with submit_batch and parses its results.
+    
+    Args:
+        batch_id: The batch ID returned by submit_batch.
+        template_full: The full template object.
+        template_id: The template ID.
+        poll_seconds: Sleep time between status checks.
+        
+    Returns:
+        A dictionary with "instances" (custom_id -> validated vPGM instance)
+        and "errors" (custom_id -> error message) for requests that failed.
         
-    return results
+    Raises:
+        RuntimeError: If the batch does not complete.
+    """
+    template = get_template_by_id(template_full, template_id)
+    spec = get_template_spec(template)
+    client = get_openai_client()
+    
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        if batch.status in ("failed", "expired", "cancelled"):
+            raise RuntimeError(f"Batch {batch_id} ended with status '{batch.status}'.")
+        if batch.status == "completed":
+            break
+        time.sleep(poll_seconds)
+        
+    instances = {}
+    errors = {}
+    
+    if batch.output_file_id:
+        for line in client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            record = _json_loads(line)
+            custom_id = record.get("custom_id")
+            try:
+                response = record.get("response") or {}
+                if response.get("status_code") != 200:
+                    raise ValueError(f"Request failed with status {response.get('status_code')}: {record.get('error')}")
+                raw_output = response["body"]["choices"][0]["message"]["content"]
+                instance = parse_vpgm_instance(raw_output)
+                validate_vpgm_instance_against_template(instance, spec)
+                instances[custom_id] = instance
+            except Exception as e:
+                errors[custom_id] = str(e)
+                
+    if batch.error_file_id:
+        for line in client.files.content(batch.error_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            record = _json_loads(line)
+            errors[record.get("custom_id")] = str(record.get("error") or record.get("response"))
+            
+    return {
+        "instances": instances,
+        "errors": errors
+    }
 
 def main():
     try: